@@ -1,13 +1,15 @@
+import click
 from flask import Flask
+from jinja2 import FileSystemBytecodeCache
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 import os
 
 # Extensions
- db = SQLAlchemy()
- migrate = Migrate()
- login_manager = LoginManager()
+db = SQLAlchemy()
+migrate = Migrate()
+login_manager = LoginManager()
 
 
 def create_app() -> Flask:
@@ -23,6 +25,20 @@ def create_app() -> Flask:
     except OSError:
         pass
 
+    # Encode JSON responses with orjson
+    from cabinet.utils.json_provider import OrjsonProvider
+
+    app.json = OrjsonProvider(app)
+
+    # Keep compiled templates on disk so new workers skip parsing them
+    if not app.debug:
+        cache_dir = os.path.join(app.instance_path, "jinja_cache")
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory=cache_dir)
+
+    # Register the SQLite connection pragmas (WAL, cache sizing)
+    import cabinet.utils.sqlite_pragmas  # noqa: F401
+
     # Init extensions
     db.init_app(app)
     migrate.init_app(app, db)
@@ -47,6 +63,16 @@ def create_app() -> Flask:
     app.register_blueprint(templates_bp, url_prefix="/templates")
     app.register_blueprint(cessions_bp, url_prefix="/cessions")
 
+    @app.cli.command("warm-templates")
+    def warm_templates():
+        """Compile every template once to fill the bytecode cache (run at build time)."""
+        if app.jinja_env.bytecode_cache is None:
+            raise click.ClickException(
+                "No Jinja bytecode cache configured (debug mode): run with FLASK_ENV=production"
+            )
+        for name in app.jinja_env.list_templates():
+            app.jinja_env.get_template(name)
+
     @app.route("/healthz")
     def healthz():
         return {"status": "ok"}
@@ -1,5 +1,6 @@
 from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required
+from sqlalchemy.orm import undefer
 
 from . import auth_bp
 from .forms import LoginForm
@@ -10,7 +11,7 @@ from cabinet.models import User
 @login_manager.user_loader
 def load_user(user_id: str):
     try:
-        return User.query.get(int(user_id))
+        return db.session.get(User, int(user_id))
     except Exception:
         return None
 
@@ -19,7 +20,11 @@ def load_user(user_id: str):
 def login():
     form = LoginForm()
     if form.validate_on_submit():
-        user = User.query.filter_by(email=form.email.data.lower()).first()
+        user = (
+            User.query.options(undefer(User.password_hash))
+            .filter_by(email=form.email.data.strip().lower())
+            .first()
+        )
         if user and user.check_password(form.password.data):
             login_user(user)
             next_url = request.args.get("next") or url_for("dashboard.index")
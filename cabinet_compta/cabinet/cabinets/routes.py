@@ -26,7 +26,7 @@ def create():
 @cabinets_bp.route("/<int:cabinet_id>/delete", methods=["POST"]) 
 @login_required
 def delete(cabinet_id: int):
-    item = Cabinet.query.get_or_404(cabinet_id)
+    item = db.get_or_404(Cabinet, cabinet_id)
     db.session.delete(item)
     db.session.commit()
     return redirect(url_for("cabinets.index"))
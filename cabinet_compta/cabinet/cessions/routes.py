@@ -1,5 +1,6 @@
 from flask import render_template, request, redirect, url_for
 from flask_login import login_required
+from sqlalchemy.orm import selectinload
 
 from app import db
 from cabinet.models import Cession, Societe
@@ -10,7 +11,11 @@ from . import cessions_bp
 @cessions_bp.route("/")
 @login_required
 def index():
-    items = Cession.query.order_by(Cession.created_at.desc()).all()
+    items = (
+        Cession.query.options(selectinload(Cession.societe))
+        .order_by(Cession.created_at.desc())
+        .all()
+    )
     societes = Societe.query.order_by(Societe.name.asc()).all()
     return render_template("cessions/index.html", cessions=items, societes=societes)
 
@@ -28,10 +33,10 @@ def create():
     payment_mode = request.form.get("payment_mode")
     conditions = request.form.get("conditions")
 
-    if not societe_id or not cedant or not cessionnaire or not parts_count:
+    if not societe_id or not cedant or not cessionnaire or (parts_count or 0) <= 0:
         return redirect(url_for("cessions.index"))
 
-    societe = Societe.query.get_or_404(societe_id)
+    societe = db.get_or_404(Societe, societe_id)
     cession = Cession(
         societe_id=societe_id,
         cedant=cedant,
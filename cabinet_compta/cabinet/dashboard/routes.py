@@ -1,16 +1,29 @@
 from flask import render_template, jsonify
 from flask_login import login_required
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
 
 from . import dashboard_bp
+from app import db
 from cabinet.models import Societe, Cession
 
 
 @dashboard_bp.route("/")
 @login_required
 def index():
-    societes_count = Societe.query.count()
-    last_cessions = Cession.query.order_by(Cession.created_at.desc()).limit(10).all()
+    # Fetch the societes count alongside the latest cessions in one statement
+    societes_count_sq = select(func.count(Societe.id)).scalar_subquery()
+    rows = db.session.execute(
+        select(Cession, societes_count_sq)
+        .options(joinedload(Cession.societe))
+        .order_by(Cession.created_at.desc())
+        .limit(10)
+    ).all()
+    last_cessions = [r[0] for r in rows]
+    if rows:
+        societes_count = rows[0][1]
+    else:
+        societes_count = db.session.scalar(select(func.count(Societe.id)))
     return render_template(
         "dashboard/index.html",
         societes_count=societes_count,
@@ -21,11 +34,9 @@ def index():
 @dashboard_bp.route("/dashboard/data/companies-by-type.json")
 @login_required
 def companies_by_type_json():
-    rows = (
-        Societe.query.with_entities(Societe.type_juridique, func.count(Societe.id))
-        .group_by(Societe.type_juridique)
-        .all()
-    )
-    labels = [r[0] or "N/A" for r in rows]
-    values = [r[1] for r in rows]
-    return jsonify({"labels": labels, "values": values})
+    rows = db.session.execute(
+        select(Societe.type_juridique, func.count(Societe.id)).group_by(Societe.type_juridique)
+    ).all()
+    types, values = zip(*rows) if rows else ((), ())
+    labels = [t or "N/A" for t in types]
+    return jsonify({"labels": labels, "values": list(values)})
@@ -1,13 +1,31 @@
-from flask import render_template, request, redirect, url_for
+import hashlib
+import re
+
+from flask import abort, current_app, render_template, request, redirect, url_for, send_file
 from flask_login import login_required
+from markupsafe import escape
 
 from io import BytesIO
 from app import db
 from cabinet.models import DocTemplate, Societe
-from cabinet.utils.pdf import render_pdf
+from cabinet.utils.pdf import (
+    render_pdf,
+    pdf_cache_path,
+    pdf_cache_version,
+    prune_pdf_cache,
+    store_pdf,
+    touch_cached_pdf,
+)
 
 from . import templates_bp
 
+# All supported placeholders, substituted in a single pass over the content
+_PH_RE = re.compile(r"\{\{\s*(NOM|GERANT|DATE|TYPE_JURIDIQUE|RC)\s*\}\}")
+# The date is free text ("le 1er août 2024 à Casablanca"); only cap its length
+MAX_DATE_LENGTH = 200
+
+PDF_SHELL = "doc_templates/pdf/base.html"
+
 
 @templates_bp.route("/")
 @login_required
@@ -31,14 +49,14 @@ def create():
 @templates_bp.route("/<int:template_id>")
 @login_required
 def edit(template_id: int):
-    item = DocTemplate.query.get_or_404(template_id)
+    item = db.get_or_404(DocTemplate, template_id)
     return render_template("doc_templates/edit.html", item=item)
 
 
 @templates_bp.route("/<int:template_id>/save", methods=["POST"]) 
 @login_required
 def save(template_id: int):
-    item = DocTemplate.query.get_or_404(template_id)
+    item = db.get_or_404(DocTemplate, template_id)
     item.title = request.form.get("title") or item.title
     item.type = request.form.get("type") or item.type
     item.content = request.form.get("content") or item.content
@@ -49,7 +67,7 @@ def save(template_id: int):
 @templates_bp.route("/<int:template_id>/delete", methods=["POST"]) 
 @login_required
 def delete(template_id: int):
-    item = DocTemplate.query.get_or_404(template_id)
+    item = db.get_or_404(DocTemplate, template_id)
     db.session.delete(item)
     db.session.commit()
     return redirect(url_for("templates.index"))
@@ -58,31 +76,57 @@ def delete(template_id: int):
 @templates_bp.route("/<int:template_id>/pdf")
 @login_required
 def export_pdf(template_id: int):
-    item = DocTemplate.query.get_or_404(template_id)
+    item = db.get_or_404(DocTemplate, template_id)
     company_id = request.args.get("company_id", type=int)
-    societe = Societe.query.get(company_id) if company_id else None
+    societe = db.session.get(Societe, company_id) if company_id else None
+    date = request.args.get("date") or ""
+    if len(date) > MAX_DATE_LENGTH:
+        abort(400)
 
     # Build context for placeholders
     context = {
         "NOM": societe.name if societe else "",
         "GERANT": societe.gerant if societe else "",
-        "DATE": request.args.get("date") or "",
+        "DATE": date,
         "TYPE_JURIDIQUE": societe.type_juridique if societe else "",
         "RC": societe.rc if societe else "",
     }
-
-    html = render_template(
-        "doc_templates/pdf/base.html",
-        raw_content=item.content,
-        context=context,
-        title=item.title,
-    )
-    pdf_bytes = render_pdf(html)
-    return (
-        pdf_bytes,
-        200,
-        {
-            "Content-Type": "application/pdf",
-            "Content-Disposition": f"attachment; filename={item.type}-{item.id}.pdf",
-        },
+    # Values are user input (query string, free-text societe fields): escape
+    # them so they cannot inject markup or resources into the rendered PDF
+    filled = _PH_RE.sub(lambda m: str(escape(context[m.group(1)] or "")), item.content)
+
+    # Rendered PDFs only depend on the template, the placeholder values, the
+    # HTML shell and the renderer: reuse the file while none of them changed.
+    # The shell also receives ``context``, so every placeholder value is part
+    # of the key, whether or not the template content uses it.
+    key = hashlib.blake2b(
+        (
+            f"{pdf_cache_version(PDF_SHELL)}:{item.id}:{item.updated_at}:"
+            f"{item.title}:{context}:{filled}"
+        ).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+    path = pdf_cache_path(key)
+
+    if not touch_cached_pdf(path):
+        html = render_template(
+            PDF_SHELL,
+            raw_content=filled,
+            context=context,
+            title=item.title,
+        )
+        store_pdf(path, render_pdf(html))
+        prune_pdf_cache(keep=path)
+
+    response = send_file(
+        path,
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name=f"{item.type}-{item.id}.pdf",
+        etag=key,
+        max_age=current_app.config["PDF_CACHE_MAX_AGE"],
     )
+    # Documents sit behind the login: let browsers revalidate, not shared caches
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
@@ -1,26 +1,71 @@
 from datetime import datetime, date
+from flask import current_app
 from flask_login import UserMixin
+import numpy as np
 from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy.orm import relationship
-from sqlalchemy import func
+from sqlalchemy.orm import relationship, column_property, deferred, validates
+from sqlalchemy import func, inspect, select
 
 from app import db
 
+# Below this many associates the NumPy/Numba dispatch costs more than it saves
+VECTORIZE_MIN_ASSOCIATES = 64
+
+
+def _percents_numpy(parts: np.ndarray) -> np.ndarray:
+    total = parts.sum()
+    return parts * (100.0 / max(total, 1))
+
+
+_percents_kernel = None
+
+
+def _percents(parts: np.ndarray) -> np.ndarray:
+    """Percent of the total for each entry of ``parts``.
+
+    Numba is imported and the kernel compiled on the first call only, so
+    workers that never see a large societe do not pay for it. Any failure
+    (numba missing, no writable cache location, compile error) falls back
+    to the plain NumPy version for the rest of the process.
+    """
+    global _percents_kernel
+    if _percents_kernel is None:
+        try:
+            from numba import njit
+
+            kernel = njit(cache=True)(_percents_numpy)
+            result = kernel(parts)
+        except Exception:
+            _percents_kernel = _percents_numpy
+        else:
+            _percents_kernel = kernel
+            return result
+    return _percents_kernel(parts)
+
 
 class TimestampMixin:
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Indexed: every listing orders by created_at DESC
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(255), unique=True, nullable=False, index=True)
-    password_hash = db.Column(db.String(255), nullable=False)
+    # Deferred: only the login form needs the hash, not every user_loader hit
+    password_hash = deferred(db.Column(db.String(255), nullable=False))
     role = db.Column(db.String(50), default="admin", nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    @validates("email")
+    def normalize_email(self, key: str, value: str) -> str:
+        # Stored lowercased so logins stay a plain probe of the unique email index
+        return value.strip().lower() if value else value
+
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(
+            password, method=current_app.config.get("PASSWORD_HASH_METHOD", "scrypt")
+        )
 
     def check_password(self, password: str) -> bool:
         return check_password_hash(self.password_hash, password)
@@ -39,7 +84,7 @@ class Cabinet(db.Model, TimestampMixin):
 class Societe(db.Model, TimestampMixin):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False, index=True)
-    type_juridique = db.Column(db.String(50), nullable=True)
+    type_juridique = db.Column(db.String(50), nullable=True, index=True)
     capital = db.Column(db.Float, nullable=True)
     gerant = db.Column(db.String(255), nullable=True)
     rc = db.Column(db.String(255), nullable=True)
@@ -51,22 +96,38 @@ class Societe(db.Model, TimestampMixin):
     cessions = relationship("Cession", back_populates="societe", cascade="all, delete-orphan")
 
     def total_parts(self) -> int:
+        # Only pull the associates when they are already loaded, otherwise sum in SQL
+        state = inspect(self)
+        if state.persistent and "associates" in state.unloaded:
+            return self.total_parts_sql
         return sum(a.parts_count for a in self.associates)
 
     def distribution(self):
-        total = self.total_parts() or 1
+        associates = list(self.associates)
+        if len(associates) > VECTORIZE_MIN_ASSOCIATES:
+            parts = np.fromiter((a.parts_count for a in associates), dtype=np.int64, count=len(associates))
+            percents = _percents(parts).tolist()
+        else:
+            factor = 100.0 / (sum(a.parts_count for a in associates) or 1)
+            percents = [a.parts_count * factor for a in associates]
         return [
             {
                 "name": a.name,
                 "address": a.address,
                 "parts_count": a.parts_count,
-                "percent": (a.parts_count / total) * 100.0,
+                "percent": percent,
             }
-            for a in self.associates
+            for a, percent in zip(associates, percents)
         ]
 
 
 class Associate(db.Model, TimestampMixin):
+    # Only created by create_all on new databases. Existing ones must first merge
+    # duplicate (societe_id, name) rows, then run the CREATE UNIQUE INDEX by hand.
+    __table_args__ = (
+        db.Index("ix_associate_societe_name", "societe_id", "name", unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     societe_id = db.Column(db.Integer, db.ForeignKey("societe.id"), nullable=False)
     name = db.Column(db.String(255), nullable=False)
@@ -76,6 +137,15 @@ class Associate(db.Model, TimestampMixin):
     societe = relationship("Societe", back_populates="associates")
 
 
+Societe.total_parts_sql = column_property(
+    select(func.coalesce(func.sum(Associate.parts_count), 0))
+    .where(Associate.societe_id == Societe.id)
+    .correlate_except(Associate)
+    .scalar_subquery(),
+    deferred=True,
+)
+
+
 class DocTemplate(db.Model, TimestampMixin):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
@@ -103,15 +173,27 @@ class Cession(db.Model, TimestampMixin):
         """Apply a cession to a societe's associates distribution in-memory.
         Creates associates if needed, ensures no negative parts.
         """
-        if parts <= 0:
-            return
-        cedant_assoc = next((a for a in societe.associates if a.name == cedant), None)
-        if cedant_assoc is None:
-            cedant_assoc = Associate(name=cedant, parts_count=0)
-            societe.associates.append(cedant_assoc)
-        cessionnaire_assoc = next((a for a in societe.associates if a.name == cessionnaire), None)
-        if cessionnaire_assoc is None:
-            cessionnaire_assoc = Associate(name=cessionnaire, parts_count=0)
-            societe.associates.append(cessionnaire_assoc)
-        cedant_assoc.parts_count = max(0, (cedant_assoc.parts_count or 0) - parts)
-        cessionnaire_assoc.parts_count = (cessionnaire_assoc.parts_count or 0) + parts
+        Cession.apply_many(societe, [(cedant, cessionnaire, parts)])
+
+    @staticmethod
+    def apply_many(societe: "Societe", transfers) -> None:
+        """Apply several (cedant, cessionnaire, parts) transfers in a single pass.
+        Associates are indexed by name once, so each transfer is a dict lookup.
+        """
+        by_name = {a.name: a for a in societe.associates}
+
+        def get_or_create(name: str) -> Associate:
+            assoc = by_name.get(name)
+            if assoc is None:
+                assoc = Associate(name=name, parts_count=0)
+                societe.associates.append(assoc)
+                by_name[name] = assoc
+            return assoc
+
+        for cedant, cessionnaire, parts in transfers:
+            if parts <= 0:
+                continue
+            cedant_assoc = get_or_create(cedant)
+            cessionnaire_assoc = get_or_create(cessionnaire)
+            cedant_assoc.parts_count = max(0, (cedant_assoc.parts_count or 0) - parts)
+            cessionnaire_assoc.parts_count = (cessionnaire_assoc.parts_count or 0) + parts
@@ -2,7 +2,9 @@ from io import BytesIO
 
 from flask import render_template, request, redirect, url_for, send_file
 from flask_login import login_required
-import pandas as pd
+from openpyxl import Workbook
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 
 from . import societes_bp
 from app import db
@@ -12,7 +14,11 @@ from cabinet.models import Societe, Cabinet
 @societes_bp.route("/")
 @login_required
 def index():
-    items = Societe.query.order_by(Societe.created_at.desc()).all()
+    items = (
+        Societe.query.options(joinedload(Societe.cabinet))
+        .order_by(Societe.created_at.desc())
+        .all()
+    )
     cabinets = Cabinet.query.order_by(Cabinet.name.asc()).all()
     return render_template("societes/index.html", societes=items, cabinets=cabinets)
 
@@ -43,22 +49,30 @@ def create():
 @societes_bp.route("/export/xlsx")
 @login_required
 def export_xlsx():
-    rows = [
-        {
-            "ID": s.id,
-            "Nom": s.name,
-            "Type": s.type_juridique,
-            "Capital": s.capital,
-            "Gérant": s.gerant,
-            "RC": s.rc,
-            "Cabinet": s.cabinet.name if s.cabinet else None,
-        }
-        for s in Societe.query.order_by(Societe.name.asc()).all()
-    ]
-    df = pd.DataFrame(rows)
+    headers = ["ID", "Nom", "Type", "Capital", "Gérant", "RC", "Cabinet"]
+    stmt = (
+        select(
+            Societe.id,
+            Societe.name,
+            Societe.type_juridique,
+            Societe.capital,
+            Societe.gerant,
+            Societe.rc,
+            Cabinet.name,
+        )
+        .outerjoin(Societe.cabinet)
+        .order_by(Societe.name.asc())
+        .execution_options(yield_per=1000)
+    )
+
+    # Write-only mode streams rows out instead of keeping every cell in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sociétés")
+    ws.append(headers)
+    for row in db.session.execute(stmt):
+        ws.append(tuple(row))
     output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Sociétés")
+    wb.save(output)
     output.seek(0)
     return send_file(
         output,
@@ -0,0 +1,34 @@
+import typing as t
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider encoding with orjson.
+
+    Types orjson does not handle natively (and dates, which Flask renders as
+    HTTP dates) are still passed to Flask's default hook, so payloads match
+    the stock provider.
+    """
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        return self._encode(obj).decode("utf-8")
+
+    def loads(self, s: t.Union[str, bytes], **kwargs: t.Any) -> t.Any:
+        return orjson.loads(s)
+
+    def response(self, *args: t.Any, **kwargs: t.Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        # orjson already returns UTF-8 bytes; hand them to the response as is
+        return self._app.response_class(
+            self._encode(obj, orjson.OPT_APPEND_NEWLINE), mimetype=self.mimetype
+        )
+
+    def _encode(self, obj: t.Any, option: int = 0) -> bytes:
+        option |= orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
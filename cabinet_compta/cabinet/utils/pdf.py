@@ -1,14 +1,105 @@
+import hashlib
+import os
+import tempfile
+import time
 from typing import Optional
 
+from flask import current_app
+
 try:
+    import weasyprint
     from weasyprint import HTML
 except Exception:  # pragma: no cover
     HTML = None  # type: ignore
 
+# Part of every cache key, so output of the HTML fallback or of another
+# WeasyPrint release is never served from the cache
+RENDERER_VERSION = f"weasyprint-{weasyprint.__version__}" if HTML is not None else "html-fallback"
+
 
 def render_pdf(html_string: str) -> bytes:
     if HTML is None:
         # Fallback to simple bytes to avoid runtime error in environments without WeasyPrint deps
         return html_string.encode("utf-8")
+    # Let WeasyPrint build a fresh FontConfiguration per render: a shared
+    # one accumulates every template's @font-face rules and is not thread-safe
     pdf = HTML(string=html_string).write_pdf()
     return pdf
+
+
+def pdf_cache_version(template_name: str) -> str:
+    """Identify the renderer and the current source of the HTML shell template."""
+    env = current_app.jinja_env
+    source, _, _ = env.loader.get_source(env, template_name)
+    shell = hashlib.blake2b(source.encode("utf-8"), digest_size=8).hexdigest()
+    return f"{RENDERER_VERSION}:{shell}"
+
+
+def pdf_cache_path(cache_name: str) -> str:
+    cache_dir = current_app.config["PDF_CACHE_DIR"]
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, f"{cache_name}.pdf")
+
+
+def store_pdf(path: str, pdf_bytes: bytes) -> None:
+    """Write a rendered PDF atomically so concurrent readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(pdf_bytes)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def touch_cached_pdf(path: str) -> bool:
+    """Mark a cached PDF as recently used; False when it is not (or no longer) cached."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def prune_pdf_cache(keep: Optional[str] = None) -> None:
+    """Drop cached PDFs unused for PDF_CACHE_TTL, then the least recently used
+    ones until the cache fits in PDF_CACHE_MAX_BYTES.
+    """
+    cache_dir = current_app.config["PDF_CACHE_DIR"]
+    ttl = current_app.config["PDF_CACHE_TTL"]
+    max_bytes = current_app.config["PDF_CACHE_MAX_BYTES"]
+    now = time.time()
+
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(".pdf") or entry.path == keep:
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            if now - st.st_mtime > ttl:
+                _remove_quietly(entry.path)
+            else:
+                entries.append((st.st_mtime, st.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    if keep is not None and os.path.exists(keep):
+        total += os.path.getsize(keep)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove_quietly(path)
+        total -= size
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
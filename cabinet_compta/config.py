@@ -1,6 +1,28 @@
 import os
 from datetime import timedelta
 
+
+def _is_memory_sqlite(uri: str) -> bool:
+    # Flask-SQLAlchemy forces StaticPool for these, which takes no pool sizing
+    return uri.split("?", 1)[0] in ("sqlite://", "sqlite:///:memory:")
+
+
+def _engine_options(uri: str) -> dict:
+    options = {"pool_pre_ping": True, "pool_recycle": 1800}
+    if uri.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False, "timeout": 30}
+        if _is_memory_sqlite(uri):
+            return options
+        # Each SQLite connection keeps its own 64 MiB page cache
+        # (cabinet.utils.sqlite_pragmas): keep the pool small
+        pool_size, max_overflow = 10, 0
+    else:
+        pool_size, max_overflow = 25, 25
+    options["pool_size"] = int(os.environ.get("DB_POOL_SIZE", pool_size))
+    options["max_overflow"] = int(os.environ.get("DB_MAX_OVERFLOW", max_overflow))
+    return options
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-change-me")
     SQLALCHEMY_DATABASE_URI = os.environ.get(
@@ -8,9 +30,24 @@ class Config:
         f"sqlite:///{os.path.join(os.path.dirname(__file__), 'instance', 'database.db')}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
     REMEMBER_COOKIE_DURATION = timedelta(days=7)
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = "Lax"
+    EXPORT_DIR = os.environ.get(
+        "EXPORT_DIR",
+        os.path.join(os.path.dirname(__file__), 'instance', 'exports')
+    )
+    # Rendered PDF cache: its own directory, since pruning deletes any *.pdf in it
+    PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR", os.path.join(EXPORT_DIR, 'pdf_cache'))
+    PDF_CACHE_MAX_AGE = 3600
+    # On-disk PDF cache bounds: unused files expire, total size is capped
+    PDF_CACHE_TTL = int(os.environ.get("PDF_CACHE_TTL", 7 * 24 * 3600))
+    PDF_CACHE_MAX_BYTES = int(os.environ.get("PDF_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+    # Werkzeug method string, the cost is encoded in it (scrypt:N:r:p).
+    # Every shipped config keeps Werkzeug's default; lower it only via the
+    # environment for CI (hashes keep the cost they were created with).
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
 
 class DevConfig(Config):
     DEBUG = True